@@ -3,6 +3,9 @@
 import sys
 from unittest import mock
 
+import numpy as np
+import torch
+
 from ultralytics import YOLO
 from ultralytics.cfg import get_cfg
 from ultralytics.engine.exporter import Exporter
@@ -131,3 +134,40 @@ def test_classify():
     assert test_func in pred.callbacks["on_predict_start"], "callback test failed"
     result = pred(source=ASSETS, model=trainer.best)
     assert len(result), "predictor test failed"
+
+
+def test_match_predictions():
+    """Test greedy IoU matching of predictions to labels, including exact IoU ties."""
+    val = detect.DetectionValidator(args=CFG)
+    thresholds = val.iouv.tolist()
+
+    # (labels, detections) IoU: detection 0 ties for labels 0 and 1, label 0 vs detection 2 is the wrong class
+    pred_classes = torch.tensor([0, 0, 1])
+    true_classes = torch.tensor([0, 0, 1])
+    iou = torch.tensor([[0.72, 0.62, 0.8], [0.72, 0.0, 0.0], [0.0, 0.0, 0.93]])
+    correct = val.match_predictions(pred_classes, true_classes, iou)
+    # Tied detection 0 goes to the highest-index label (1), which leaves label 0 to detection 1
+    expected = torch.tensor([[t <= x for t in thresholds] for x in (0.72, 0.62, 0.93)])
+    assert torch.equal(correct, expected)
+
+    def reference(pred_classes, true_classes, iou):
+        """Per-threshold greedy matching with a stable sort."""
+        iou = (iou * (true_classes[:, None] == pred_classes)).numpy()
+        correct = np.zeros((iou.shape[1], len(thresholds)), dtype=bool)
+        for i, threshold in enumerate(thresholds):
+            matches = np.array(np.nonzero(iou >= threshold)).T
+            matches = matches[iou[matches[:, 0], matches[:, 1]].argsort(kind="stable")[::-1]]
+            matches = matches[np.unique(matches[:, 1], return_index=True)[1]]
+            matches = matches[np.unique(matches[:, 0], return_index=True)[1]]
+            correct[matches[:, 1], i] = True
+        return torch.tensor(correct)
+
+    torch.manual_seed(0)
+    for _ in range(100):
+        nl, npr = torch.randint(1, 10, (2,)).tolist()
+        pred_classes, true_classes = torch.randint(0, 2, (npr,)), torch.randint(0, 2, (nl,))
+        iou = (torch.rand(nl, npr) * 20).round() / 20  # rounded to create exact ties
+        iou[torch.rand(nl, npr) < 0.5] = 0
+        assert torch.equal(
+            val.match_predictions(pred_classes, true_classes, iou), reference(pred_classes, true_classes, iou)
+        )
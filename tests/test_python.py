@@ -1,6 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import contextlib
+import math
 from copy import copy
 from pathlib import Path
 
@@ -477,6 +478,10 @@ def test_utils_ops():
         ltwh2xywh,
         ltwh2xyxy,
         make_divisible,
+        scale_boxes,
+        scale_boxes_batched,
+        scale_coords,
+        scale_coords_batched,
         xywh2ltwh,
         xywh2xyxy,
         xywhn2xyxy,
@@ -499,6 +504,40 @@ def test_utils_ops():
     boxes[:, 4] = torch.randn(10) * 30
     torch.allclose(boxes, xyxyxyxy2xywhr(xywhr2xyxyxyxy(boxes)), rtol=1e-3)
 
+    # Batched scaling matches per-image scaling
+    torch.manual_seed(0)
+    imgsz = 640
+    img0_shapes = [(480, 640), (640, 427), (1080, 1920), (333, 500)]
+    ratio_pads = []
+    for h0, w0 in img0_shapes:  # as recorded by BaseDataset.load_image() and LetterBox(auto=False, scaleup=False)
+        r = imgsz / max(h0, w0)
+        h, w = min(math.ceil(h0 * r), imgsz), min(math.ceil(w0 * r), imgsz)
+        dw, dh = (imgsz - w) / 2, (imgsz - h) / 2
+        ratio_pads.append(((h / h0, w / w0), (int(round(dw - 0.1)), int(round(dh - 0.1)))))
+    assert ratio_pads[2][1] == (0, 140) and ratio_pads[3][1] == (0, 106)
+    for n in 12, 0:
+        batch_idx = torch.randint(0, len(img0_shapes), (n,))
+        order = batch_idx.sort(stable=True)[1]  # per-image results are concatenated in image order
+        for xywh in False, True:
+            boxes = torch.rand(n, 4) * 700 - 30
+            scaled = torch.cat(
+                [
+                    scale_boxes((imgsz, imgsz), boxes[batch_idx == i].clone(), s, ratio_pad=r, xywh=xywh)
+                    for i, (s, r) in enumerate(zip(img0_shapes, ratio_pads))
+                ]
+            )
+            batched = scale_boxes_batched(boxes.clone(), img0_shapes, ratio_pads, batch_idx, xywh=xywh)
+            assert torch.equal(batched[order], scaled)
+        kpts = torch.rand(n, 17, 3) * 700 - 30
+        scaled = torch.cat(
+            [
+                scale_coords((imgsz, imgsz), kpts[batch_idx == i].clone(), s, ratio_pad=r)
+                for i, (s, r) in enumerate(zip(img0_shapes, ratio_pads))
+            ]
+        )
+        batched = scale_coords_batched(kpts.clone(), img0_shapes, ratio_pads, batch_idx)
+        assert torch.equal(batched[order], scaled)
+
 
 def test_utils_files():
     """Test file handling utilities."""
@@ -187,7 +187,7 @@ class BaseValidator:
                 preds = self.postprocess(preds)
 
             self.update_metrics(preds, batch)
-            if self.args.plots and batch_i < 3:
+            if self.is_plot_batch:
                 self.plot_val_samples(batch, batch_i)
                 self.plot_predictions(batch, preds, batch_i)
 
@@ -235,7 +235,14 @@ class BaseValidator:
         correct_class = true_classes[:, None] == pred_classes
         iou = iou * correct_class  # zero out the wrong classes
         iou = iou.cpu().numpy()
-        for i, threshold in enumerate(self.iouv.cpu().tolist()):
+        thresholds = self.iouv.cpu().tolist()
+        if not use_scipy:
+            # Candidate matches at the lowest threshold, sorted by IoU once and filtered per threshold below
+            candidates = np.array(np.nonzero(iou >= min(thresholds))).T
+            scores = iou[candidates[:, 0], candidates[:, 1]]
+            order = scores.argsort(kind="stable")[::-1]
+            candidates, scores = candidates[order], scores[order]
+        for i, threshold in enumerate(thresholds):
             if use_scipy:
                 # WARNING: known issue that reduces mAP in https://github.com/ultralytics/ultralytics/pull/4708
                 import scipy  # scope import to avoid importing for all commands
@@ -247,11 +254,9 @@ class BaseValidator:
                     if valid.any():
                         correct[detections_idx[valid], i] = True
             else:
-                matches = np.nonzero(iou >= threshold)  # IoU > threshold and classes match
-                matches = np.array(matches).T
+                matches = candidates[scores >= threshold]  # IoU > threshold and classes match, sorted by IoU
                 if matches.shape[0]:
                     if matches.shape[0] > 1:
-                        matches = matches[iou[matches[:, 0], matches[:, 1]].argsort()[::-1]]
                         matches = matches[np.unique(matches[:, 1], return_index=True)[1]]
                         # matches = matches[matches[:, 2].argsort()[::-1]]
                         matches = matches[np.unique(matches[:, 0], return_index=True)[1]]
@@ -316,6 +321,11 @@ class BaseValidator:
         """Returns the metric keys used in YOLO training/validation."""
         return []
 
+    @property
+    def is_plot_batch(self):
+        """Whether the current batch is plotted by plot_val_samples() and plot_predictions()."""
+        return self.args.plots and self.batch_i < 3
+
     def on_plot(self, name, data=None):
         """Registers plots (e.g. to be consumed in callbacks)"""
         self.plots[Path(name)] = {"data": data, "timestamp": time.time()}
@@ -113,23 +113,15 @@ class RTDETRValidator(DetectionValidator):
 
         return outputs
 
-    def _prepare_batch(self, si, batch):
-        """Prepares a batch for training or inference by applying transformations."""
-        idx = batch["batch_idx"] == si
-        cls = batch["cls"][idx].squeeze(-1)
-        bbox = batch["bboxes"][idx]
-        ori_shape = batch["ori_shape"][si]
-        imgsz = batch["img"].shape[2:]
-        ratio_pad = batch["ratio_pad"][si]
-        if len(cls):
-            bbox = ops.xywh2xyxy(bbox)  # target boxes
-            bbox[..., [0, 2]] *= ori_shape[1]  # native-space pred
-            bbox[..., [1, 3]] *= ori_shape[0]  # native-space pred
-        return {"cls": cls, "bbox": bbox, "ori_shape": ori_shape, "imgsz": imgsz, "ratio_pad": ratio_pad}
+    def _prepare_gt_bboxes(self, batch):
+        """Returns native-space ground truth boxes of all images in a batch, RT-DETR labels are not letterboxed."""
+        bbox = ops.xywh2xyxy(batch["bboxes"])  # target boxes
+        wh = torch.tensor([s[::-1] for s in batch["ori_shape"]], device=self.device)[batch["batch_idx"].long()]
+        return bbox * wh.repeat(1, 2)  # native-space labels
 
     def _prepare_pred(self, pred, pbatch):
         """Prepares and returns a batch with transformed bounding boxes and class labels."""
-        predn = pred.clone()
+        predn = pred.clone() if self.is_plot_batch else pred  # plotted preds must stay unscaled
         predn[..., [0, 2]] *= pbatch["ori_shape"][1] / self.args.imgsz  # native-space pred
         predn[..., [1, 3]] *= pbatch["ori_shape"][0] / self.args.imgsz  # native-space pred
         return predn.float()
@@ -48,15 +48,17 @@ class DetectionValidator(BaseValidator):
         for k in ["batch_idx", "cls", "bboxes"]:
             batch[k] = batch[k].to(self.device)
 
+        # Built once per batch and reused for every image in _prepare_batch()
+        nb, _, height, width = batch["img"].shape
+        batch["whwh"] = torch.tensor((width, height, width, height), device=self.device)  # normalized xywh gain
+        batch["batch_one_hot"] = batch["batch_idx"].view(-1, 1) == torch.arange(nb, device=self.device)  # shape(n,nb)
+        batch["bboxes_native"] = self._prepare_gt_bboxes(batch)
+
         if self.args.save_hybrid:
-            height, width = batch["img"].shape[2:]
-            nb = len(batch["img"])
-            bboxes = batch["bboxes"] * torch.tensor((width, height, width, height), device=self.device)
+            bboxes = batch["bboxes"] * batch["whwh"]
+            one_hot = batch["batch_one_hot"]
             self.lb = (
-                [
-                    torch.cat([batch["cls"][batch["batch_idx"] == i], bboxes[batch["batch_idx"] == i]], dim=-1)
-                    for i in range(nb)
-                ]
+                [torch.cat([batch["cls"][one_hot[:, i]], bboxes[one_hot[:, i]]], dim=-1) for i in range(nb)]
                 if self.args.save_hybrid
                 else []
             )  # for autolabelling
@@ -97,20 +99,24 @@ class DetectionValidator(BaseValidator):
 
     def _prepare_batch(self, si, batch):
         """Prepares a batch of images and annotations for validation."""
-        idx = batch["batch_idx"] == si
+        idx = batch["batch_one_hot"][:, si]
         cls = batch["cls"][idx].squeeze(-1)
-        bbox = batch["bboxes"][idx]
+        bbox = batch["bboxes_native"][idx]
         ori_shape = batch["ori_shape"][si]
         imgsz = batch["img"].shape[2:]
         ratio_pad = batch["ratio_pad"][si]
-        if len(cls):
-            bbox = ops.xywh2xyxy(bbox) * torch.tensor(imgsz, device=self.device)[[1, 0, 1, 0]]  # target boxes
-            ops.scale_boxes(imgsz, bbox, ori_shape, ratio_pad=ratio_pad)  # native-space labels
         return {"cls": cls, "bbox": bbox, "ori_shape": ori_shape, "imgsz": imgsz, "ratio_pad": ratio_pad}
 
+    def _prepare_gt_bboxes(self, batch):
+        """Returns native-space ground truth boxes of all images in a batch, scaled in one op instead of per image."""
+        bbox = ops.xywh2xyxy(batch["bboxes"]) * batch["whwh"]  # target boxes
+        return ops.scale_boxes_batched(
+            bbox, batch["ori_shape"], batch["ratio_pad"], batch["batch_idx"]
+        )  # native-space labels
+
     def _prepare_pred(self, pred, pbatch):
         """Prepares a batch of images and annotations for validation."""
-        predn = pred.clone()
+        predn = pred.clone() if self.is_plot_batch else pred  # plotted preds must stay unscaled
         ops.scale_boxes(
             pbatch["imgsz"], predn[:, :4], pbatch["ori_shape"], ratio_pad=pbatch["ratio_pad"]
         )  # native-space pred
@@ -252,11 +258,14 @@ class DetectionValidator(BaseValidator):
     def save_one_txt(self, predn, save_conf, shape, file):
         """Save YOLO detections to a txt file in normalized coordinates in a specific format."""
         gn = torch.tensor(shape)[[1, 0, 1, 0]]  # normalization gain whwh
+        texts = []
         for *xyxy, conf, cls in predn.tolist():
             xywh = (ops.xyxy2xywh(torch.tensor(xyxy).view(1, 4)) / gn).view(-1).tolist()  # normalized xywh
             line = (cls, *xywh, conf) if save_conf else (cls, *xywh)  # label format
-            with open(file, "a") as f:
-                f.write(("%g " * len(line)).rstrip() % line + "\n")
+            texts.append(("%g " * len(line)).rstrip() % line)
+        if texts:
+            with open(file, "a") as f:  # open once per image, not once per detection
+                f.writelines(text + "\n" for text in texts)
 
     def pred_to_json(self, predn, filename):
         """Serialize YOLO predictions to COCO json format."""
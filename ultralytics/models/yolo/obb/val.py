@@ -67,22 +67,17 @@ class OBBValidator(DetectionValidator):
         iou = batch_probiou(gt_bboxes, torch.cat([detections[:, :4], detections[:, -1:]], dim=-1))
         return self.match_predictions(detections[:, 5], gt_cls, iou)
 
-    def _prepare_batch(self, si, batch):
-        """Prepares and returns a batch for OBB validation."""
-        idx = batch["batch_idx"] == si
-        cls = batch["cls"][idx].squeeze(-1)
-        bbox = batch["bboxes"][idx]
-        ori_shape = batch["ori_shape"][si]
-        imgsz = batch["img"].shape[2:]
-        ratio_pad = batch["ratio_pad"][si]
-        if len(cls):
-            bbox[..., :4].mul_(torch.tensor(imgsz, device=self.device)[[1, 0, 1, 0]])  # target boxes
-            ops.scale_boxes(imgsz, bbox, ori_shape, ratio_pad=ratio_pad, xywh=True)  # native-space labels
-        return {"cls": cls, "bbox": bbox, "ori_shape": ori_shape, "imgsz": imgsz, "ratio_pad": ratio_pad}
+    def _prepare_gt_bboxes(self, batch):
+        """Returns native-space rotated ground truth boxes of all images in a batch for OBB validation."""
+        bbox = batch["bboxes"].clone()
+        bbox[..., :4].mul_(batch["whwh"])  # target boxes
+        return ops.scale_boxes_batched(
+            bbox, batch["ori_shape"], batch["ratio_pad"], batch["batch_idx"], xywh=True
+        )  # native-space labels
 
     def _prepare_pred(self, pred, pbatch):
         """Prepares and returns a batch for OBB validation with scaled and padded bounding boxes."""
-        predn = pred.clone()
+        predn = pred.clone() if self.is_plot_batch else pred  # plotted preds must stay unscaled
         ops.scale_boxes(
             pbatch["imgsz"], predn[:, :4], pbatch["ori_shape"], ratio_pad=pbatch["ratio_pad"], xywh=True
         )  # native-space pred
@@ -119,12 +114,15 @@ class OBBValidator(DetectionValidator):
     def save_one_txt(self, predn, save_conf, shape, file):
         """Save YOLO detections to a txt file in normalized coordinates in a specific format."""
         gn = torch.tensor(shape)[[1, 0]]  # normalization gain whwh
+        texts = []
         for *xywh, conf, cls, angle in predn.tolist():
             xywha = torch.tensor([*xywh, angle]).view(1, 5)
             xyxyxyxy = (ops.xywhr2xyxyxyxy(xywha) / gn).view(-1).tolist()  # normalized xywh
             line = (cls, *xyxyxyxy, conf) if save_conf else (cls, *xyxyxyxy)  # label format
-            with open(file, "a") as f:
-                f.write(("%g " * len(line)).rstrip() % line + "\n")
+            texts.append(("%g " * len(line)).rstrip() % line)
+        if texts:
+            with open(file, "a") as f:  # open once per image, not once per detection
+                f.writelines(text + "\n" for text in texts)
 
     def eval_json(self, stats):
         """Evaluates YOLO output in JSON format and returns performance statistics."""
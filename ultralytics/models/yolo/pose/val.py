@@ -43,6 +43,11 @@ class PoseValidator(DetectionValidator):
         """Preprocesses the batch by converting the 'keypoints' data into a float and moving it to the device."""
         batch = super().preprocess(batch)
         batch["keypoints"] = batch["keypoints"].to(self.device).float()
+        kpts = batch["keypoints"].clone()  # native-space copy, 'keypoints' stay normalized for loss and plots
+        kpts[..., :2] *= batch["whwh"][:2]
+        batch["keypoints_native"] = ops.scale_coords_batched(
+            kpts, batch["ori_shape"], batch["ratio_pad"], batch["batch_idx"]
+        )
         return batch
 
     def get_desc(self):
@@ -86,13 +91,7 @@ class PoseValidator(DetectionValidator):
     def _prepare_batch(self, si, batch):
         """Prepares a batch for processing by converting keypoints to float and moving to device."""
         pbatch = super()._prepare_batch(si, batch)
-        kpts = batch["keypoints"][batch["batch_idx"] == si]
-        h, w = pbatch["imgsz"]
-        kpts = kpts.clone()
-        kpts[..., 0] *= w
-        kpts[..., 1] *= h
-        kpts = ops.scale_coords(pbatch["imgsz"], kpts, pbatch["ori_shape"], ratio_pad=pbatch["ratio_pad"])
-        pbatch["kpts"] = kpts
+        pbatch["kpts"] = batch["keypoints_native"][batch["batch_one_hot"][:, si]]
         return pbatch
 
     def _prepare_pred(self, pred, pbatch):
@@ -233,9 +232,10 @@ class PoseValidator(DetectionValidator):
                     assert x.is_file(), f"{x} file not found"
                 anno = COCO(str(anno_json))  # init annotations api
                 pred = anno.loadRes(str(pred_json))  # init predictions api (must pass string, not Path)
+                img_ids = [int(Path(x).stem) for x in self.dataloader.dataset.im_files]  # images to eval
                 for i, eval in enumerate([COCOeval(anno, pred, "bbox"), COCOeval(anno, pred, "keypoints")]):
                     if self.is_coco:
-                        eval.params.imgIds = [int(Path(x).stem) for x in self.dataloader.dataset.im_files]  # im to eval
+                        eval.params.imgIds = img_ids
                     eval.evaluate()
                     eval.accumulate()
                     eval.summarize()
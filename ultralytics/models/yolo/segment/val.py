@@ -33,22 +33,26 @@ class SegmentationValidator(DetectionValidator):
         super().__init__(dataloader, save_dir, pbar, args, _callbacks)
         self.plot_masks = None
         self.process = None
+        self.rle_pool = None
+        self.pt_outputs = True
         self.args.task = "segment"
         self.metrics = SegmentMetrics(save_dir=self.save_dir, on_plot=self.on_plot)
 
     def preprocess(self, batch):
-        """Preprocesses batch by converting masks to float and sending to device."""
+        """Preprocesses batch by sending masks to device, keeping their integer dtype."""
         batch = super().preprocess(batch)
-        batch["masks"] = batch["masks"].to(self.device).float()
+        batch["masks"] = batch["masks"].to(self.device)  # uint8 (or int32 overlap index) masks
         return batch
 
     def init_metrics(self, model):
         """Initialize metrics and select mask processing function based on save_json flag."""
         super().init_metrics(model)
         self.plot_masks = []
+        self.pt_outputs = getattr(model, "pt", True)  # PyTorch models (and trainer models) return raw head outputs
         if self.args.save_json:
             check_requirements("pycocotools>=2.0.6")
             self.process = ops.process_mask_upsample  # more accurate
+            self.rle_pool = ThreadPool(NUM_THREADS)  # reused to RLE-encode masks of every image
         else:
             self.process = ops.process_mask  # faster
         self.stats = dict(tp_m=[], tp=[], conf=[], pred_cls=[], target_cls=[])
@@ -81,20 +85,20 @@ class SegmentationValidator(DetectionValidator):
             max_det=self.args.max_det,
             nc=self.nc,
         )
-        proto = preds[1][-1] if len(preds[1]) == 3 else preds[1]  # second output is len 3 if pt, but only 1 if exported
+        proto = preds[1][-1] if self.pt_outputs else preds[1]  # second output is (feats, mc, proto) if pt, else proto
         return p, proto
 
     def _prepare_batch(self, si, batch):
         """Prepares a batch for training or inference by processing images and targets."""
         prepared_batch = super()._prepare_batch(si, batch)
-        midx = [si] if self.args.overlap_mask else batch["batch_idx"] == si
+        midx = [si] if self.args.overlap_mask else batch["batch_one_hot"][:, si]
         prepared_batch["masks"] = batch["masks"][midx]
         return prepared_batch
 
     def _prepare_pred(self, pred, pbatch, proto):
         """Prepares a batch for training or inference by processing images and targets."""
+        pred_masks = self.process(proto, pred[:, 6:], pred[:, :4], shape=pbatch["imgsz"])  # before boxes are rescaled
         predn = super()._prepare_pred(pred, pbatch)
-        pred_masks = self.process(proto, pred[:, 6:], pred[:, :4], shape=pbatch["imgsz"])
         return predn, pred_masks
 
     def update_metrics(self, preds, batch):
@@ -141,18 +145,19 @@ class SegmentationValidator(DetectionValidator):
             for k in self.stats.keys():
                 self.stats[k].append(stat[k])
 
-            pred_masks = torch.as_tensor(pred_masks, dtype=torch.uint8)
-            if self.args.plots and self.batch_i < 3:
-                self.plot_masks.append(pred_masks[:15].cpu())  # filter top 15 to plot
+            if self.is_plot_batch:
+                self.plot_masks.append(pred_masks[:15].to(torch.uint8).cpu())  # filter top 15 to plot
 
             # Save
             if self.args.save_json:
-                pred_masks = ops.scale_image(
-                    pred_masks.permute(1, 2, 0).contiguous().cpu().numpy(),
-                    pbatch["ori_shape"],
-                    ratio_pad=batch["ratio_pad"][si],
+                ratio_pad = batch["ratio_pad"][si]
+                pred_masks = torch.cat(
+                    [
+                        (ops.scale_masks(m[None], pbatch["ori_shape"], ratio_pad=ratio_pad)[0] > 0.5).cpu()
+                        for m in pred_masks.split(16)  # chunked to bound device memory at native resolution
+                    ]
                 )
-                self.pred_to_json(predn, batch["im_file"][si], pred_masks)
+                self.pred_to_json(predn, batch["im_file"][si], pred_masks.numpy())  # (N, H, W)
             # if self.args.save_txt:
             #    save_one_txt(predn, save_conf, shape, file=save_dir / 'labels' / f'{path.stem}.txt')
 
@@ -160,6 +165,10 @@ class SegmentationValidator(DetectionValidator):
         """Sets speed and confusion matrix for evaluation metrics."""
         self.metrics.speed = self.speed
         self.metrics.confusion_matrix = self.confusion_matrix
+        if self.rle_pool is not None:
+            self.rle_pool.close()
+            self.rle_pool.join()
+            self.rle_pool = None
 
     def _process_batch(self, detections, gt_bboxes, gt_cls, pred_masks=None, gt_masks=None, overlap=False, masks=False):
         """
@@ -176,12 +185,13 @@ class SegmentationValidator(DetectionValidator):
             if overlap:
                 nl = len(gt_cls)
                 index = torch.arange(nl, device=gt_masks.device).view(nl, 1, 1) + 1
-                gt_masks = gt_masks.repeat(nl, 1, 1)  # shape(1,640,640) -> (n,640,640)
-                gt_masks = torch.where(gt_masks == index, 1.0, 0.0)
+                gt_masks = gt_masks == index  # broadcast shape(1,640,640) -> (n,640,640) bool
             if gt_masks.shape[1:] != pred_masks.shape[1:]:
-                gt_masks = F.interpolate(gt_masks[None], pred_masks.shape[1:], mode="bilinear", align_corners=False)[0]
+                gt_masks = F.interpolate(
+                    gt_masks[None].float(), pred_masks.shape[1:], mode="bilinear", align_corners=False
+                )[0]
                 gt_masks = gt_masks.gt_(0.5)
-            iou = mask_iou(gt_masks.view(gt_masks.shape[0], -1), pred_masks.view(pred_masks.shape[0], -1))
+            iou = mask_iou(gt_masks.view(gt_masks.shape[0], -1).float(), pred_masks.view(pred_masks.shape[0], -1))
         else:  # boxes
             iou = box_iou(gt_bboxes, detections[:, :4])
 
@@ -233,19 +243,17 @@ class SegmentationValidator(DetectionValidator):
         image_id = int(stem) if stem.isnumeric() else stem
         box = ops.xyxy2xywh(predn[:, :4])  # xywh
         box[:, :2] -= box[:, 2:] / 2  # xy center to top-left corner
-        pred_masks = np.transpose(pred_masks, (2, 0, 1))
-        with ThreadPool(NUM_THREADS) as pool:
-            rles = pool.map(single_encode, pred_masks)
-        for i, (p, b) in enumerate(zip(predn.tolist(), box.tolist())):
-            self.jdict.append(
-                {
-                    "image_id": image_id,
-                    "category_id": self.class_map[int(p[5])],
-                    "bbox": [round(x, 3) for x in b],
-                    "score": round(p[4], 5),
-                    "segmentation": rles[i],
-                }
-            )
+        rles = self.rle_pool.map(single_encode, pred_masks)
+        self.jdict.extend(
+            {
+                "image_id": image_id,
+                "category_id": self.class_map[int(p[5])],
+                "bbox": [round(x, 3) for x in b],
+                "score": round(p[4], 5),
+                "segmentation": rle,
+            }
+            for p, b, rle in zip(predn.tolist(), box.tolist(), rles)
+        )
 
     def eval_json(self, stats):
         """Return COCO-style object detection evaluation metrics."""
@@ -262,9 +270,10 @@ class SegmentationValidator(DetectionValidator):
                     assert x.is_file(), f"{x} file not found"
                 anno = COCO(str(anno_json))  # init annotations api
                 pred = anno.loadRes(str(pred_json))  # init predictions api (must pass string, not Path)
+                img_ids = [int(Path(x).stem) for x in self.dataloader.dataset.im_files]  # images to eval
                 for i, eval in enumerate([COCOeval(anno, pred, "bbox"), COCOeval(anno, pred, "segm")]):
                     if self.is_coco:
-                        eval.params.imgIds = [int(Path(x).stem) for x in self.dataloader.dataset.im_files]  # im to eval
+                        eval.params.imgIds = img_ids
                     eval.evaluate()
                     eval.accumulate()
                     eval.summarize()
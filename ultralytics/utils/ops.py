@@ -123,6 +123,53 @@ def scale_boxes(img1_shape, boxes, img0_shape, ratio_pad=None, padding=True, xyw
     return clip_boxes(boxes, img0_shape)
 
 
+def _letterbox_params(img0_shapes, ratio_pads, batch_idx, device=None):
+    """
+    Gathers the letterbox parameters of each row's image for the batched scaling ops.
+
+    Args:
+        img0_shapes (list): the shape of each original image, in the format of (height, width).
+        ratio_pads (list): the (ratio, pad) tuple of each image, as recorded by the dataset letterbox.
+        batch_idx (torch.Tensor): the index of the image each row belongs to.
+        device (torch.device, optional): the device to create the parameters on.
+
+    Returns:
+        (torch.Tensor): Tensor of shape [n, 5] with the gain, padw, padh, w0, h0 of each row.
+    """
+    params = [(r[0][0], *r[1], s[1], s[0]) for s, r in zip(img0_shapes, ratio_pads)]  # gain, padw, padh, w0, h0
+    return torch.tensor(params, device=device).view(-1, 5)[batch_idx.long()]
+
+
+def scale_boxes_batched(boxes, img0_shapes, ratio_pads, batch_idx, xywh=False):
+    """
+    Rescales the bounding boxes of all images in a batch to the shape of their own original image. This is the batched
+    counterpart of `scale_boxes()` with a given `ratio_pad`, every box is scaled with the ratio and pad of its image in
+    one op.
+
+    Args:
+        boxes (torch.Tensor): the bounding boxes of all images, in the format of (x1, y1, x2, y2)
+        img0_shapes (list): the shape of each original image, in the format of (height, width).
+        ratio_pads (list): the (ratio, pad) tuple of each image, as recorded by the dataset letterbox.
+        batch_idx (torch.Tensor): the index of the image each bounding box belongs to.
+        xywh (bool): The box format is xywh or not, default=False.
+
+    Returns:
+        boxes (torch.Tensor): The scaled bounding boxes, in the format of (x1, y1, x2, y2)
+    """
+    gain, padw, padh, w0, h0 = _letterbox_params(img0_shapes, ratio_pads, batch_idx, boxes.device).T  # per box
+    boxes[..., 0] -= padw  # x padding
+    boxes[..., 1] -= padh  # y padding
+    if not xywh:
+        boxes[..., 2] -= padw  # x padding
+        boxes[..., 3] -= padh  # y padding
+    boxes[..., :4] /= gain[:, None]
+    boxes[..., 0] = boxes[..., 0].clamp(min=0).minimum(w0)  # clip to each image, see clip_boxes()
+    boxes[..., 1] = boxes[..., 1].clamp(min=0).minimum(h0)
+    boxes[..., 2] = boxes[..., 2].clamp(min=0).minimum(w0)
+    boxes[..., 3] = boxes[..., 3].clamp(min=0).minimum(h0)
+    return boxes
+
+
 def make_divisible(x, divisor):
     """
     Returns the nearest number that is divisible by the given divisor.
@@ -721,7 +768,7 @@ def process_mask_native(protos, masks_in, bboxes, shape):
     return masks.gt_(0.5)
 
 
-def scale_masks(masks, shape, padding=True):
+def scale_masks(masks, shape, padding=True, ratio_pad=None):
     """
     Rescale segment masks to shape.
 
@@ -730,13 +777,18 @@ def scale_masks(masks, shape, padding=True):
         shape (tuple): Height and width.
         padding (bool): If True, assuming the boxes is based on image augmented by yolo style. If False then do regular
             rescaling.
+        ratio_pad (tuple): a tuple of (ratio, pad) of the letterbox transform. If not provided, the padding will be
+            calculated based on the size difference between the masks and shape.
     """
     mh, mw = masks.shape[2:]
-    gain = min(mh / shape[0], mw / shape[1])  # gain  = old / new
-    pad = [mw - shape[1] * gain, mh - shape[0] * gain]  # wh padding
-    if padding:
-        pad[0] /= 2
-        pad[1] /= 2
+    if ratio_pad is None:  # calculate from shape
+        gain = min(mh / shape[0], mw / shape[1])  # gain  = old / new
+        pad = [mw - shape[1] * gain, mh - shape[0] * gain]  # wh padding
+        if padding:
+            pad[0] /= 2
+            pad[1] /= 2
+    else:
+        pad = ratio_pad[1]
     top, left = (int(pad[1]), int(pad[0])) if padding else (0, 0)  # y, x
     bottom, right = (int(mh - pad[1]), int(mw - pad[0]))
     masks = masks[..., top:bottom, left:right]
@@ -780,6 +832,31 @@ def scale_coords(img1_shape, coords, img0_shape, ratio_pad=None, normalize=False
     return coords
 
 
+def scale_coords_batched(coords, img0_shapes, ratio_pads, batch_idx):
+    """
+    Rescale segment coordinates (xy) of all images in a batch to the shape of their own original image, the batched
+    counterpart of `scale_coords()` with a given `ratio_pad`.
+
+    Args:
+        coords (torch.Tensor): the coords of all images to be scaled, of shape n,...,2.
+        img0_shapes (list): the shape of each original image.
+        ratio_pads (list): the (ratio, pad) tuple of each image, as recorded by the dataset letterbox.
+        batch_idx (torch.Tensor): the index of the image each row of coords belongs to.
+
+    Returns:
+        coords (torch.Tensor): The scaled coordinates.
+    """
+    params = _letterbox_params(img0_shapes, ratio_pads, batch_idx, coords.device)
+    gain, padw, padh, w0, h0 = params.view(-1, 5, *(1,) * (coords.ndim - 2)).unbind(1)  # broadcast over coord dims
+    coords[..., 0] -= padw  # x padding
+    coords[..., 1] -= padh  # y padding
+    coords[..., 0] /= gain
+    coords[..., 1] /= gain
+    coords[..., 0] = coords[..., 0].clamp(min=0).minimum(w0)  # clip to each image, see clip_coords()
+    coords[..., 1] = coords[..., 1].clamp(min=0).minimum(h0)
+    return coords
+
+
 def regularize_rboxes(rboxes):
     """
     Regularize rotated boxes in range [0, pi/2].